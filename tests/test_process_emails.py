@@ -0,0 +1,181 @@
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import process_emails  # noqa: E402
+
+
+class OversizedQuantityTest(unittest.TestCase):
+    """Quantities beyond 64 bits must not stop the run (orjson cannot encode them)."""
+
+    def test_oversized_quantity_is_written_and_run_continues(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            inbox = Path(tmp) / 'inbox'
+            data = Path(tmp) / 'data'
+            inbox.mkdir()
+            (inbox / 'a.txt').write_text(
+                'From: big@example.com\nSubject: Bulk\n\nI need 99999999999999999999 widgets.\n',
+                encoding='utf-8'
+            )
+            (inbox / 'b.txt').write_text(
+                'From: small@example.com\nSubject: Small\n\nI need 3 gadgets.\n',
+                encoding='utf-8'
+            )
+
+            process_emails.process_inbox(inbox, data, workers=1)
+
+            events = [json.loads(p.read_text(encoding='utf-8')) for p in (data / 'events').glob('*.json')]
+            quantities = sorted(e['items'][0]['quantity']['value'] for e in events)
+            self.assertEqual(quantities, [3, 99999999999999999999])
+            self.assertEqual(list(data.rglob('*.tmp')), [])
+            timeline = (data / 'timeline' / 'activity.jsonl').read_text(encoding='utf-8').splitlines()
+            self.assertEqual(len(timeline), 6)
+
+
+class HeaderParsingTest(unittest.TestCase):
+    """From/Subject lines split on every separator str.splitlines() accepts."""
+
+    def setUp(self):
+        self.parser = process_emails.EmailParser({}, {})
+
+    def test_non_newline_separators_split_header_lines(self):
+        for sep in ('\n', '\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', '\x85', '\u2028', '\u2029'):
+            with self.subTest(sep=repr(sep)):
+                event = self.parser.parse(f'From: a@x{sep}Subject: hi\n\nbody', email_id='x')
+                self.assertEqual(event.from_.value, 'a@x')
+                self.assertEqual(event.subject.value, 'hi')
+                self.assertNotIn('subject', event.missing_fields)
+
+    def test_last_repeated_header_wins_and_empty_header_is_missing(self):
+        event = self.parser.parse('From: first@x\nSubject:\nFROM: second@x\n\nbody', email_id='x')
+        self.assertEqual(event.from_.value, 'second@x')
+        self.assertEqual(event.subject.value, '')
+        self.assertEqual(event.subject.notes, 'missing subject')
+        self.assertIn('subject', event.missing_fields)
+
+
+class ProductScanTest(unittest.TestCase):
+    """The word-token product scan reports the same items as the per-key regexes did."""
+
+    def setUp(self):
+        price_list = {name: {'unit_price': 1.0} for name in ('Widget', 'Gadget', 'Gadget Pro', 'Pro')}
+        self.parser = process_emails.EmailParser(price_list, {})
+
+    def items(self, body):
+        event = self.parser.parse(f'From: a@x\nSubject: s\n\n{body}', email_id='x')
+        return [(i.product_name.value, i.quantity.value) for i in event.items]
+
+    def test_one_word_between_quantity_and_product(self):
+        self.assertEqual(self.items('I need 3 big widgets.'), [('Widget', 3)])
+
+    def test_repeated_key_inside_quantity_span_is_not_a_bare_mention(self):
+        self.assertEqual(self.items('I need 3 widgets widgets.'), [('Widget', 3)])
+        self.assertEqual(self.items('I need 3 widget widgets.'), [('Widget', 3)])
+
+    def test_number_followed_by_punctuation_is_not_a_quantity(self):
+        self.assertEqual(self.items('I need 3, widgets.'), [('Widget', None)])
+        self.assertEqual(self.items('I need 3. widgets'), [('Widget', None)])
+
+    def test_multi_word_product_next_to_its_last_word(self):
+        expected = [('Gadget', 4), ('Gadget Pro', 4), ('Pro', 4)]
+        self.assertEqual(self.items('Send 4 Gadget Pro.'), expected)
+        self.assertEqual(self.items('Send 4 Gadget Pro and 2 Pro.'), expected)
+
+    def test_singular_and_plural_keys_merge_into_one_item(self):
+        self.assertEqual(self.items('2 widget and 5 widgets please'), [('Widget', 2)])
+        self.assertEqual(self.items('a widget and 5 widgets'), [('Widget', 5)])
+
+
+class RerunTest(unittest.TestCase):
+    """Existing acknowledgments and quotes are kept when an email is parsed again."""
+
+    def test_missing_event_with_existing_ack_and_quote_logs_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            inbox = Path(tmp) / 'inbox'
+            data = Path(tmp) / 'data'
+            inbox.mkdir()
+            (inbox / 'a.txt').write_text('From: a@example.com\nSubject: Order\n\nI need 3 widgets.\n', encoding='utf-8')
+            process_emails.process_inbox(inbox, data, workers=1)
+            ack_file, = (data / 'outbox').glob('*.json')
+            quote_file, = (data / 'quotes').glob('*.json')
+            ack, quote = ack_file.read_bytes(), quote_file.read_bytes()
+            event_file, = (data / 'events').glob('*.json')
+            event_file.unlink()
+
+            process_emails.process_inbox(inbox, data, workers=1)
+
+            self.assertTrue(event_file.exists())
+            self.assertEqual(ack_file.read_bytes(), ack)
+            self.assertEqual(quote_file.read_bytes(), quote)
+            records = (data / 'timeline' / 'activity.jsonl').read_text(encoding='utf-8').splitlines()
+            steps = [(r['step'], r['status']) for r in map(json.loads, records[3:])]
+            self.assertEqual(steps, [('parse_email', 'success'), ('generate_ack', 'skipped'), ('generate_quote', 'skipped')])
+
+
+class WorkerStateTest(unittest.TestCase):
+    """_init_worker keeps the parse cache only while the inputs are unchanged."""
+
+    def setUp(self):
+        process_emails._worker_state = None
+        process_emails._parse_cache.clear()
+        self.addCleanup(process_emails._parse_cache.clear)
+
+    def cache_after_reinit(self, price_list, config):
+        process_emails._init_worker({'Widget': {'unit_price': 1.0}}, {}, [])
+        parser = process_emails._worker_state[0]
+        process_emails._cached_parse(parser, 'x', 'From: a@x\nSubject: s\n\n3 widgets')
+        process_emails._init_worker(price_list, config, [])
+        return list(process_emails._parse_cache)
+
+    def test_same_inputs_keep_cache(self):
+        self.assertEqual(self.cache_after_reinit({'Widget': {'unit_price': 1.0}}, {}), ['x'])
+
+    def test_changed_price_list_clears_cache(self):
+        self.assertEqual(self.cache_after_reinit({'Widget': {'unit_price': 2.0}}, {}), [])
+
+    def test_changed_config_clears_cache(self):
+        self.assertEqual(self.cache_after_reinit({'Widget': {'unit_price': 1.0}}, {'currency': 'USD'}), [])
+
+
+class WorkerPoolTest(unittest.TestCase):
+    """Running through the process pool writes what the in-process path writes, in the same order."""
+
+    def run_inbox(self, tmp, workers):
+        inbox = Path(tmp) / 'inbox'
+        data = Path(tmp) / f'data{workers}'
+        process_emails.process_inbox(inbox, data, workers=workers)
+        artefacts = {
+            str(p.relative_to(data)): p.read_bytes()
+            for p in data.rglob('*.json')
+        }
+        records = [json.loads(line) for line in (data / 'timeline' / 'activity.jsonl').read_text(encoding='utf-8').splitlines()]
+        timeline = [(r['step'], r['status'], r['message'], r['email_id']) for r in records]
+        return artefacts, timeline
+
+    def test_pool_matches_single_process(self):
+        samples = Path(__file__).resolve().parent.parent / 'samples' / 'inbox'
+        with tempfile.TemporaryDirectory() as tmp:
+            inbox = Path(tmp) / 'inbox'
+            shutil.copytree(samples, inbox)
+            # A byte-identical copy of email1 and a file that is not valid UTF-8.
+            shutil.copyfile(inbox / 'email1.txt', inbox / 'email1_copy.txt')
+            (inbox / 'email0.txt').write_bytes(b'From: a@x\nSubject: s\n\n\xff\n')
+
+            artefacts, timeline = self.run_inbox(tmp, 1)
+            self.assertEqual(self.run_inbox(tmp, 3), (artefacts, timeline))
+
+        self.assertEqual(timeline[0][:2], ('read_email', 'error'))
+        self.assertIn('email0.txt', timeline[0][2])
+        skips = [t for t in timeline if t[0] == 'skip_email']
+        self.assertEqual(len(skips), 1)
+        self.assertEqual(skips[0][1:3], ('skipped', 'Event for email1_copy.txt already processed'))
+        self.assertEqual(skips[0][3], timeline[1][3])
+
+
+if __name__ == '__main__':
+    unittest.main()